@@ -1,16 +1,100 @@
 import logging
+import os
+import sys
+import tempfile
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
 import re
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+from numba import njit, prange, get_num_threads
+from collections import defaultdict
 from datetime import datetime
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import MinMaxScaler
 from rapidfuzz import process, fuzz
+from rapidfuzz.utils import default_process
 from .responses import responses, intents
-from .utils import parse_release_date, format_release_date, extract_numeric_range
+from .utils import parse_release_date, format_release_date, extract_numeric_range, split_artists
 
 logger = logging.getLogger(__name__)
 
+# Features the user is asked about when collecting preferences
+PREFERENCE_FEATURES = ['valence', 'acousticness', 'danceability', 'energy', 'tempo']
+
+# Patterns used on every turn or every column, compiled once
+SONG_BY_ARTIST_PATTERN = re.compile(r"(?P<song>.+?) by (?P<artist>.+)")
+NON_WORD_SPACE_PATTERN = re.compile(r'[^\w\s]')
+NON_WORD_PATTERN = re.compile(r'[^\w]')
+
+# Every (intent_name, phrase) pair, in the order intents are checked
+INTENT_PHRASES = [(intent_name, phrase) for intent_name, phrases in intents.items() for phrase in phrases]
+
+# Normalised names of the dataset columns the chatbot reads; everything else is skipped at parse time
+DATASET_COLUMNS = {
+    'valence', 'acousticness', 'artists', 'danceability', 'energy', 'tempo', 'name', 'popularity',
+    'release_date', 'releasedate', 'year', 'duration_ms', 'instrumentalness', 'speechiness', 'loudness',
+}
+
+# Format version of the cleaned-dataset cache; bump it whenever load_dataset's cleaning or dtypes change
+DATASET_CACHE_VERSION = b'1'
+DATASET_CACHE_VERSION_KEY = b'nagma_cache_version'
+
+# Maximum number of piped stdin lines answered per get_responses batch
+STDIN_BATCH_SIZE = 1000
+
+# Features summarised in artist statistics
+ARTIST_STAT_FEATURES = ['valence', 'energy', 'danceability', 'tempo', 'acousticness', 'instrumentalness', 'speechiness', 'loudness']
+
+
+# Fast-math flags for the filter kernel, without 'ninf'/'nnan': unset preferences
+# are passed as -inf/inf bounds, which must compare correctly
+FILTER_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+@njit(parallel=True, fastmath=FILTER_FASTMATH, cache=True)
+def _filter_topk(feat, pop, lo, hi, k, n_chunks):
+    """
+    Scans the feature matrix once, keeping the k most popular rows whose
+    features all fall within [lo, hi].
+
+    Rows are split into `n_chunks` chunks scanned in parallel; each chunk keeps
+    its own top-k, ordered by popularity with earlier rows first on ties.
+    Bounds of -inf/inf leave a feature unconstrained.
+
+    Returns:
+        tuple: (best_pop, best_row) arrays of shape (n_chunks, k); unused slots hold -1.
+    """
+    n, m = feat.shape
+    chunk_size = (n + n_chunks - 1) // n_chunks
+    best_pop = np.full((n_chunks, k), -1, dtype=np.int64)
+    best_row = np.full((n_chunks, k), -1, dtype=np.int64)
+    for c in prange(n_chunks):
+        for i in range(c * chunk_size, min(n, (c + 1) * chunk_size)):
+            matches = True
+            for j in range(m):
+                if feat[i, j] < lo[j] or feat[i, j] > hi[j]:
+                    matches = False
+                    break
+            if not matches:
+                continue
+            p = np.int64(pop[i])
+            if p <= best_pop[c, k - 1]:
+                continue
+            pos = k - 1
+            while pos > 0 and p > best_pop[c, pos - 1]:
+                best_pop[c, pos] = best_pop[c, pos - 1]
+                best_row[c, pos] = best_row[c, pos - 1]
+                pos -= 1
+            best_pop[c, pos] = p
+            best_row[c, pos] = i
+    return best_pop, best_row
+
+
 class NagmaChatbot:
     """
     A chatbot for providing music recommendations and information.
@@ -18,22 +102,172 @@ class NagmaChatbot:
 
     def __init__(self, data_path):
         self.df = self.load_dataset(data_path)
+        self.build_indexes()
         self.user_preferences = {}
         self.context = {}
         self.state = None  # To keep track of the conversation state
         self.preferences = {}  # To store user preferences
         self.preference_params = []  # List of parameters to ask the user
         self.preference_index = 0  # Index to keep track of which parameter to ask next
+        self._intent_ac = self.build_intent_automaton()
+        self._intent_re = self.build_intent_regex() if self._intent_ac is None else None
+        # Fallback candidates, preprocessed once for fuzzy matching
+        self._responses_keys = list(responses.keys())
+        self._responses_preproc = [default_process(key) for key in self._responses_keys]
         logger.info("NagmaChatbot initialized.")
 
+    def build_intent_automaton(self):
+        """
+        Compiles all intent phrases into a single Aho-Corasick automaton.
+
+        Each phrase is stored with its rank so that, when several phrases match,
+        the one listed first in `intents` wins, as with a sequential scan.
+
+        Returns:
+            ahocorasick.Automaton or None: Automaton mapping phrases to (rank, intent_name, phrase),
+            or None if pyahocorasick is not installed.
+        """
+        if ahocorasick is None:
+            logger.info("pyahocorasick not available, falling back to regex intent matching.")
+            return None
+        automaton = ahocorasick.Automaton()
+        for rank, (intent_name, phrase) in enumerate(INTENT_PHRASES):
+            if phrase not in automaton:
+                automaton.add_word(phrase, (rank, intent_name, phrase))
+        automaton.make_automaton()
+        return automaton
+
+    def build_intent_regex(self):
+        """
+        Compiles all intent phrases into a single regex with one group per phrase.
+
+        The pattern is anchored and each phrase is a lookahead over the whole input,
+        so phrases are tried in `INTENT_PHRASES` order, as with a sequential scan.
+
+        Returns:
+            re.Pattern: Compiled pattern whose matching group number is the phrase's rank + 1.
+        """
+        alternatives = [f"(?=.*?({re.escape(phrase)}))" for _, phrase in INTENT_PHRASES]
+        return re.compile(r"\A(?:" + "|".join(alternatives) + ")", re.DOTALL)
+
+    def match_intent(self, user_input_lower):
+        """
+        Finds the intent whose phrase occurs in the user input.
+
+        Parameters:
+            user_input_lower (str): Lowercased user input.
+
+        Returns:
+            tuple: (intent_name, phrase), or (None, None) if no phrase matches.
+        """
+        if self._intent_ac is None:
+            match = self._intent_re.match(user_input_lower)
+            if not match:
+                return None, None
+            return INTENT_PHRASES[match.lastindex - 1]
+
+        matches = [value for _, value in self._intent_ac.iter(user_input_lower)]
+        if not matches:
+            return None, None
+        _, intent_name, phrase = min(matches)
+        return intent_name, phrase
+
+    def load_cached_dataset(self, path, cache_path):
+        """
+        Loads the cleaned dataset from its Feather cache, if the cache is newer than the CSV
+        and was written with the current DATASET_CACHE_VERSION.
+
+        The cache is uncompressed and memory-mapped, which makes reading it fast and
+        skips re-parsing and re-cleaning the CSV. Converting it to pandas still copies
+        every column, so nothing is shared between processes.
+
+        Parameters:
+            path (str): Path to the source CSV file.
+            cache_path (str): Path to the Feather cache.
+
+        Returns:
+            pd.DataFrame or None: The cleaned dataset, or None if there is no usable cache.
+        """
+        try:
+            if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(path):
+                return None
+            table = feather.read_table(cache_path, memory_map=True)
+            version = (table.schema.metadata or {}).get(DATASET_CACHE_VERSION_KEY)
+            if version != DATASET_CACHE_VERSION:
+                logger.info(f"Discarding dataset cache {cache_path} with format version {version!r}")
+                return None
+            df = self.normalize_string_dtypes(table.to_pandas())
+            logger.info(f"Cleaned dataset loaded from cache {cache_path} with shape: {df.shape}")
+            return df
+        except Exception as e:
+            logger.warning(f"Could not read dataset cache {cache_path}, reloading CSV: {e}")
+            return None
+
+    def normalize_string_dtypes(self, df):
+        """
+        Stores song names and artist categories as pyarrow-backed strings.
+
+        Parsing the CSV and reading the Feather cache yield different string dtypes,
+        so both paths go through here to produce the same frame.
+
+        Parameters:
+            df (pd.DataFrame): The cleaned dataset.
+
+        Returns:
+            pd.DataFrame: The dataset with normalised string columns.
+        """
+        string_dtype = pd.StringDtype('pyarrow')
+        if 'name' in df.columns:
+            df['name'] = df['name'].astype(string_dtype)
+        if 'artists' in df.columns and isinstance(df['artists'].dtype, pd.CategoricalDtype):
+            categories = df['artists'].cat.categories
+            df['artists'] = df['artists'].cat.rename_categories(categories.astype(string_dtype))
+        return df
+
+    def save_cached_dataset(self, cache_path):
+        """
+        Writes the cleaned dataset to an uncompressed Feather file for later launches.
+
+        The file is written to a temporary path in the same directory and then moved
+        into place, so concurrent readers never see a partially written cache.
+
+        Parameters:
+            cache_path (str): Path to the Feather cache.
+        """
+        tmp_path = None
+        try:
+            table = pa.Table.from_pandas(self.df)
+            metadata = {**(table.schema.metadata or {}), DATASET_CACHE_VERSION_KEY: DATASET_CACHE_VERSION}
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(cache_path)), prefix=f"{os.path.basename(cache_path)}.", suffix='.tmp'
+            )
+            os.close(fd)
+            feather.write_feather(table.replace_schema_metadata(metadata), tmp_path, compression='uncompressed')
+            os.replace(tmp_path, cache_path)
+            tmp_path = None
+            logger.info(f"Cleaned dataset cached at {cache_path}")
+        except Exception as e:
+            logger.warning(f"Could not write dataset cache {cache_path}: {e}")
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
     def load_dataset(self, path):
+        cache_path = f"{path}.clean.feather"
+        cached = self.load_cached_dataset(path, cache_path)
+        if cached is not None:
+            return cached
+
         try:
-            self.df = pd.read_csv(path)
+            # Read the header first so only the columns we use are parsed
+            header = pd.read_csv(path, nrows=0).columns
+            usecols = [col for col in header if NON_WORD_PATTERN.sub('', col).lower() in DATASET_COLUMNS]
+            self.df = pd.read_csv(path, engine='pyarrow', dtype_backend='pyarrow', usecols=usecols)
             logger.info(f"Dataset loaded successfully with shape: {self.df.shape}")
             logger.info(f"Columns in dataset before standardizing: {self.df.columns.tolist()}")
 
             # Remove special characters and standardize column names
-            self.df.columns = self.df.columns.str.replace(r'[^\w]', '', regex=True).str.lower()
+            self.df.columns = [NON_WORD_PATTERN.sub('', col).lower() for col in self.df.columns]
             logger.info(f"Dataset columns after removing special characters: {self.df.columns.tolist()}")
 
             # Mapping from your dataset's column names to expected column names
@@ -63,32 +297,50 @@ class NagmaChatbot:
             # Ensure 'release_year' is in the dataset
             if 'release_date' in self.df.columns:
                 self.df['release_date'] = pd.to_datetime(self.df['release_date'], errors='coerce')
-                self.df = self.df.dropna(subset=['release_date'])
-                self.df['release_year'] = self.df['release_date'].dt.year.astype(int)
+                valid = self.df['release_date'].notna().to_numpy()
+                release_year = self.df['release_date'].dt.year
             elif 'year' in self.df.columns:
-                self.df['release_year'] = pd.to_numeric(self.df['year'], errors='coerce').astype('Int64')
-                self.df = self.df.dropna(subset=['release_year'])
+                release_year = pd.to_numeric(self.df['year'], errors='coerce')
+                valid = release_year.notna().to_numpy()
             else:
                 logger.error("No 'release_date' or 'year' column found in the dataset.")
                 return pd.DataFrame()
 
-            logger.info(f"Number of records before filtering by year: {self.df.shape[0]}")
-            self.df = self.df[self.df['release_year'] >= 1980]
-            logger.info(f"Number of records after filtering by year: {self.df.shape[0]}")
+            # Convert essential columns to numeric
+            for col in expected_columns:
+                self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+
+            # Missing years become 0 so the column can be int16; those rows are dropped by the year filter
+            self.df['release_year'] = release_year.fillna(0).astype(np.int16)
+
+            # Build one mask for missing dates, old releases and missing essential values,
+            # so the frame is copied only once
+            logger.info(f"Number of records before filtering by year: {int(valid.sum())}")
+            mask = valid & (self.df['release_year'].to_numpy() >= 1980)
+            logger.info(f"Number of records after filtering by year: {int(mask.sum())}")
+            for col in expected_columns:
+                mask &= self.df[col].notna().to_numpy()
+            self.df = self.df.take(np.flatnonzero(mask)).reset_index(drop=True)
 
             if self.df.empty:
                 logger.error("The dataset is empty after filtering by release year.")
                 return pd.DataFrame()
 
-            # Convert essential columns to numeric
+            # Downcast numeric columns to halve the bytes scanned by filters and sorts
             for col in expected_columns:
-                self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+                self.df[col] = self.df[col].astype(np.float32)
+            if 'popularity' in self.df.columns:
+                self.df['popularity'] = pd.to_numeric(self.df['popularity'], errors='coerce').fillna(0).clip(0, 100).astype(np.uint8)
 
-            # Drop rows with NaN values in essential columns
-            self.df.dropna(subset=expected_columns, inplace=True)
+            # Store each distinct artists string once; rows hold small integer codes
+            if 'artists' in self.df.columns:
+                self.df['artists'] = self.df['artists'].astype('category')
+            self.df = self.normalize_string_dtypes(self.df)
 
             logger.info(f"DataFrame shape after cleaning: {self.df.shape}")
-            return self.df.reset_index(drop=True)
+            logger.info(f"DataFrame memory usage: {self.df.memory_usage(deep=True).sum() / 1024 ** 2:.2f} MB")
+            self.save_cached_dataset(cache_path)
+            return self.df
 
         except FileNotFoundError:
             logger.error(f"Error: The file at {path} was not found.")
@@ -100,6 +352,111 @@ class NagmaChatbot:
             logger.error(f"An unexpected error occurred during dataset loading: {e}", exc_info=True)
             return pd.DataFrame()
 
+    def build_indexes(self):
+        """
+        Precomputes NumPy arrays over the cleaned dataset so that queries
+        avoid re-scanning or copying the DataFrame.
+        """
+        if all(col in self.df.columns for col in PREFERENCE_FEATURES):
+            # Row-major float32 matrix, so the filter kernel reads each song's features together
+            self._feat_matrix = np.ascontiguousarray(self.df[PREFERENCE_FEATURES].to_numpy(dtype=np.float32))
+        else:
+            self._feat_matrix = None
+        self._pop = self.df['popularity'].to_numpy() if 'popularity' in self.df.columns else None
+        # Row ids ordered from most to least popular
+        self._pop_order = np.argsort(-self._pop.astype(np.int16), kind='stable') if self._pop is not None else None
+        # Release dates as int64 nanoseconds since the epoch
+        if 'release_date' in self.df.columns:
+            self._release_ns = self.df['release_date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        else:
+            self._release_ns = None
+
+        self._name_index = {}
+        if 'name' in self.df.columns:
+            # Map each lowercased song name to the rows carrying it
+            name_index = defaultdict(list)
+            for row, name in enumerate(self.df['name'].str.lower().to_numpy()):
+                name_index[name].append(row)
+            self._name_index = {
+                name: np.asarray(rows, dtype=np.int64) for name, rows in name_index.items()
+            }
+
+        self._artist_codes = None
+        self._artist_categories_lower = None
+        self._artist_index = {}
+        if 'artists' in self.df.columns:
+            self._artist_codes = self.df['artists'].cat.codes.to_numpy()
+            self._artist_categories_lower = self.df['artists'].cat.categories.str.lower().to_numpy(dtype=str)
+            # Map each individual artist name to the rows it appears on
+            artist_index = defaultdict(list)
+            for row, artists in enumerate(self.df['artists'].to_numpy()):
+                for artist in dict.fromkeys(split_artists(artists)):
+                    artist_index[artist].append(row)
+            self._artist_index = {
+                artist: np.asarray(rows, dtype=np.int64) for artist, rows in artist_index.items()
+            }
+
+        self._artist_agg = {}
+        self._artist_counts = {}
+        self._artist_avg_popularity = {}
+        self._artist_most_recent = {}
+        if self._artist_index:
+            # One row per (artist, song) pair, aggregated once per artist
+            tokens = np.repeat(list(self._artist_index.keys()), [len(rows) for rows in self._artist_index.values()])
+            rows = np.concatenate(list(self._artist_index.values()))
+            stat_columns = [col for col in ARTIST_STAT_FEATURES if col in self.df.columns]
+            extra_columns = [col for col in ('popularity', 'release_date') if col in self.df.columns]
+            long = self.df.iloc[rows][stat_columns + extra_columns].reset_index(drop=True)
+            long['artist_token'] = tokens
+            grouped = long.groupby('artist_token', sort=False)
+            self._artist_agg = grouped[stat_columns].agg(['mean', 'min', 'max']).to_dict('index')
+            self._artist_counts = grouped.size().to_dict()
+            if 'popularity' in long.columns:
+                self._artist_avg_popularity = grouped['popularity'].mean().to_dict()
+            if 'release_date' in long.columns:
+                self._artist_most_recent = grouped['release_date'].max().to_dict()
+
+    def top_k_by_popularity(self, mask=None, k=5):
+        """
+        Returns the row ids of the k most popular songs, optionally among a subset.
+
+        Uses np.partition (O(N)) instead of a full sort; songs tied on popularity
+        keep dataset order, matching the precomputed popularity order.
+
+        Parameters:
+            mask (np.ndarray, optional): Boolean mask selecting candidate rows.
+            k (int): Number of rows to return.
+
+        Returns:
+            np.ndarray: Row ids, most popular first.
+        """
+        if mask is None:
+            return self._pop_order[:max(k, 0)]
+        rows = np.flatnonzero(mask)
+        if k <= 0:
+            return rows[:0]
+        pop = self._pop[rows]
+        if pop.size > k:
+            # Keep only candidates at or above the k-th largest popularity
+            threshold = np.partition(pop, pop.size - k)[pop.size - k]
+            keep = pop >= threshold
+            rows, pop = rows[keep], pop[keep]
+        return rows[np.lexsort((rows, -pop.astype(np.int16)))[:k]]
+
+    def find_artist_categories(self, artist_name):
+        """
+        Finds the distinct artists strings containing a (lowercased) artist name.
+
+        Parameters:
+            artist_name (str): Lowercased artist name or part of it.
+
+        Returns:
+            np.ndarray: Boolean lookup indexed by artist code; the extra last entry
+            is False so that missing values (code -1) never match.
+        """
+        hits = np.char.find(self._artist_categories_lower, artist_name) >= 0
+        return np.append(hits, False)
+
     def get_artist_stats(self, artist_name):
         """
         Retrieves statistics and information about a specific artist.
@@ -113,27 +470,45 @@ class NagmaChatbot:
         # Clean and standardize artist_name
         artist_name = artist_name.strip().lower()
 
-        # Ensure 'artists' column is properly cleaned
-        artist_songs = self.df[self.df['artists'].str.contains(artist_name, case=False, na=False)]
+        # Exact artist names are served from the precomputed aggregates
+        if artist_name in self._artist_counts:
+            agg = self._artist_agg[artist_name]
+            stats = {
+                'total_songs': self._artist_counts[artist_name],
+                'avg_popularity': self._artist_avg_popularity.get(artist_name),
+                'most_recent': self._artist_most_recent.get(artist_name),
+            }
+            feature_stats = {
+                feature: {'mean': agg[(feature, 'mean')], 'min': agg[(feature, 'min')], 'max': agg[(feature, 'max')]}
+                for feature in ARTIST_STAT_FEATURES if feature in self.df.columns
+            }
+            return {'basic_stats': stats, 'feature_stats': feature_stats}
+
+        # Anything else falls back to a substring scan
+        if self._artist_codes is not None:
+            artist_songs = self.df[self.find_artist_categories(artist_name)[self._artist_codes]]
+        else:
+            artist_songs = self.df.iloc[0:0]
 
         if artist_songs.empty:
             logger.warning(f"No songs found for artist: {artist_name}")
             return f"I couldn't find any songs by {artist_name} in my database."
 
+        # Compute the feature statistics in one pass over a float64 block
+        present_features = [feature for feature in ARTIST_STAT_FEATURES if feature in self.df.columns]
+        vals = artist_songs[present_features].to_numpy(dtype=np.float64)
+        means, mins, maxs = np.nanmean(vals, axis=0), np.nanmin(vals, axis=0), np.nanmax(vals, axis=0)
+
         stats = {
             'total_songs': len(artist_songs),
             'avg_popularity': artist_songs['popularity'].mean() if 'popularity' in self.df.columns else None,
             'most_recent': artist_songs['release_date'].max() if 'release_date' in self.df.columns else None,
         }
 
-        feature_stats = {}
-        for feature in ['valence', 'energy', 'danceability', 'tempo', 'acousticness', 'instrumentalness', 'speechiness', 'loudness']:
-            if feature in self.df.columns:
-                feature_stats[feature] = {
-                    'mean': artist_songs[feature].mean(),
-                    'min': artist_songs[feature].min(),
-                    'max': artist_songs[feature].max()
-                }
+        feature_stats = {
+            feature: {'mean': means[i], 'min': mins[i], 'max': maxs[i]}
+            for i, feature in enumerate(present_features)
+        }
 
         return {'basic_stats': stats, 'feature_stats': feature_stats}
 
@@ -174,10 +549,11 @@ class NagmaChatbot:
     def recommend_songs(self):
         # For demonstration purposes, let's recommend the top 5 popular songs
         if 'popularity' in self.df.columns:
-            top_songs = self.df.sort_values(by='popularity', ascending=False).head(5)
+            top_songs = self.df.iloc[self.top_k_by_popularity(k=5)]
+            names = top_songs['name'].to_numpy()
+            artists = top_songs['artists'].to_numpy()
             response = "Here are some song recommendations:\n"
-            for _, song in top_songs.iterrows():
-                response += f"- {song['name']} by {song['artists']}\n"
+            response += "".join(f"- {name} by {artist}\n" for name, artist in zip(names, artists))
             return response
         else:
             return "Sorry, I don't have popularity data to make recommendations."
@@ -239,11 +615,8 @@ class NagmaChatbot:
         return explanations.get(param, "")
 
     def recommend_songs_based_on_preferences(self):
-        df_filtered = self.df.copy()
-        expected_columns = ['valence', 'acousticness', 'danceability', 'energy', 'tempo']
-
         # Check if expected columns are present
-        missing_columns = [col for col in expected_columns if col not in df_filtered.columns]
+        missing_columns = [col for col in PREFERENCE_FEATURES if col not in self.df.columns]
         if missing_columns:
             logger.error(f"Missing columns in dataset: {missing_columns}")
             return "Sorry, the dataset does not have the necessary information to recommend songs based on your preferences."
@@ -251,44 +624,48 @@ class NagmaChatbot:
         try:
             logger.info(f"Using preferences for song recommendation: {self.preferences}")
 
+            lo = np.full(len(PREFERENCE_FEATURES), -np.inf, dtype=np.float32)
+            hi = np.full(len(PREFERENCE_FEATURES), np.inf, dtype=np.float32)
             for param, value in self.preferences.items():
                 if value is None:
                     logger.warning(f"Preference '{param}' is not set. Skipping filtering for this parameter.")
                     continue
 
+                if param not in PREFERENCE_FEATURES:
+                    logger.warning(f"Parameter '{param}' not found in dataset columns. Skipping...")
+                    continue
+
                 if param == 'tempo':
                     # Use a tolerance for tempo based on BPM
                     tolerance = 10  # Adjust as needed
                     min_value = max(0, value - tolerance)
                     max_value = value + tolerance
-                    if 'tempo' in df_filtered.columns:
-                        df_filtered = df_filtered[(df_filtered['tempo'] >= min_value) & (df_filtered['tempo'] <= max_value)]
-                    else:
-                        logger.warning(f"'tempo' not found in dataset columns. Skipping filtering by tempo.")
                 else:
                     # Use a tolerance for other parameters
                     tolerance = 0.1
                     min_value = max(0, value - tolerance)
                     max_value = min(1, value + tolerance)
 
-                    # Check if the parameter exists in the DataFrame
-                    if param not in df_filtered.columns:
-                        logger.warning(f"Parameter '{param}' not found in dataset columns. Skipping...")
-                        continue
+                i = PREFERENCE_FEATURES.index(param)
+                lo[i] = min_value
+                hi[i] = max_value
 
-                    df_filtered = df_filtered[(df_filtered[param] >= min_value) & (df_filtered[param] <= max_value)]
+            # Without popularity data every match ties, so the first matches are returned
+            pop = self._pop if self._pop is not None else np.zeros(len(self._feat_matrix), dtype=np.uint8)
+            best_pop, best_row = _filter_topk(self._feat_matrix, pop, lo, hi, 5, get_num_threads())
 
-            if df_filtered.empty:
+            # Merge the per-chunk winners by popularity, then dataset order
+            found = best_row >= 0
+            best_pop, best_row = best_pop[found], best_row[found]
+            if best_row.size == 0:
                 return "Sorry, I couldn't find any songs matching your preferences."
             else:
-                # Sort by popularity if available
-                if 'popularity' in df_filtered.columns:
-                    top_songs = df_filtered.sort_values(by='popularity', ascending=False).head(5)
-                else:
-                    top_songs = df_filtered.head(5)
+                rows = best_row[np.lexsort((best_row, -best_pop))[:5]]
+                top_songs = self.df.iloc[rows]
+                names = top_songs['name'].to_numpy()
+                artists = top_songs['artists'].to_numpy()
                 response = "Here are some songs that match your preferences:\n"
-                for _, song in top_songs.iterrows():
-                    response += f"- \"{song['name']}\" by {song['artists']}\n"
+                response += "".join(f"- \"{name}\" by {artist}\n" for name, artist in zip(names, artists))
                 return response
 
         except Exception as e:
@@ -309,26 +686,29 @@ class NagmaChatbot:
         # Clean the song name
         song_name = song_name.strip().lower()
 
-        # Filter the dataset by song name
-        song_matches = self.df[self.df['name'].str.lower() == song_name]
+        # Look up the song name in the prebuilt index
+        rows = self._name_index.get(song_name, np.empty(0, dtype=np.int64))
 
         if artist_name:
             # Clean the artist name
             artist_name = artist_name.strip().lower()
             # Further filter by artist name
-            song_matches = song_matches[song_matches['artists'].str.lower().str.contains(artist_name)]
+            artist_rows = self._artist_index.get(artist_name)
+            if artist_rows is not None:
+                rows = np.intersect1d(rows, artist_rows)
+            else:
+                rows = rows[self.find_artist_categories(artist_name)[self._artist_codes[rows]]]
 
-        if song_matches.empty:
+        if rows.size == 0:
             if artist_name:
                 return f"Sorry, I couldn't find the song '{song_name}' by '{artist_name}'."
             else:
                 return f"Sorry, I couldn't find any information about the song '{song_name}'."
 
         # If multiple matches, select the most popular one
-        if 'popularity' in song_matches.columns:
-            song = song_matches.sort_values(by='popularity', ascending=False).iloc[0]
-        else:
-            song = song_matches.iloc[0]
+        row = rows[self._pop[rows].argmax()] if self._pop is not None else rows[0]
+        # Read each value from its own column so float32 features keep their short repr
+        song = {col: self.df[col].iat[row] for col in self.df.columns}
 
         # Format the song information
         response = f"Here's some information about '{song['name']}' by {song['artists']}:\n"
@@ -344,7 +724,7 @@ class NagmaChatbot:
         response += "\nMusical features:\n"
         for feature in features:
             if feature in song and pd.notnull(song[feature]):
-                response += f"- {feature.capitalize()}: {song[feature]}\n"
+                response += f"- {feature.capitalize()}: {song[feature]!s}\n"
         return response
 
     def get_trending_songs(self, num_songs=5):
@@ -361,119 +741,184 @@ class NagmaChatbot:
         if 'popularity' not in self.df.columns or 'release_date' not in self.df.columns:
             return "Sorry, I don't have enough data to determine trending songs.", False
 
-        # Ensure 'release_date' is in datetime format
-        if not pd.api.types.is_datetime64_any_dtype(self.df['release_date']):
-            self.df['release_date'] = pd.to_datetime(self.df['release_date'], errors='coerce')
-            self.df = self.df.dropna(subset=['release_date'])
-
         # Filter songs released in the last month
-        one_month_ago = datetime.now() - pd.DateOffset(months=1)
-        recent_songs = self.df[self.df['release_date'] >= one_month_ago]
+        threshold_ns = np.int64(pd.Timestamp(datetime.now() - pd.DateOffset(months=1)).value)
+        recent_mask = self._release_ns >= threshold_ns
 
-        if not recent_songs.empty:
-            # Sort the recent songs by popularity
-            trending_songs = recent_songs.sort_values(by='popularity', ascending=False).head(num_songs)
+        if recent_mask.any():
+            trending_songs = self.df.iloc[self.top_k_by_popularity(recent_mask, num_songs)]
             recent = True
         else:
             # No recent songs found, return the most popular songs of all time
-            trending_songs = self.df.sort_values(by='popularity', ascending=False).head(num_songs)
+            trending_songs = self.df.iloc[self.top_k_by_popularity(k=num_songs)]
             recent = False
 
         # Prepare the list of songs to return
-        song_list = []
-        for _, song in trending_songs.iterrows():
-            song_info = {
-                'name': song['name'],
-                'artists': song['artists'],
-                'popularity': song['popularity']
-            }
-            song_list.append(song_info)
+        song_list = [
+            {'name': name, 'artists': artists, 'popularity': popularity}
+            for name, artists, popularity in zip(
+                trending_songs['name'].tolist(),
+                trending_songs['artists'].tolist(),
+                trending_songs['popularity'].tolist(),
+            )
+        ]
 
         return song_list, recent
 
-    def get_response(self, user_input: str, user_id: str = None) -> str:
+    def get_response(self, user_input: str, user_id: str = None, fallback_scores=None) -> str:
         """
         Processes user input and returns an appropriate response.
+
+        `fallback_scores` may hold this input's precomputed similarity to each
+        fallback response key (see `get_responses`).
         """
         user_input_lower = user_input.lower()
 
-        for intent_name, phrases in intents.items():
-            for phrase in phrases:
-                if phrase in user_input_lower:
-                    if intent_name == 'song_information':
-                        # Extract the song name and artist name
-                        # Remove the phrase from the input
-                        query = user_input_lower.replace(phrase, '').strip()
-                        # Use regular expression to extract song and artist names
-                        match = re.match(r"(?P<song>.+?) by (?P<artist>.+)", query)
-                        if match:
-                            song_name = match.group('song').strip()
-                            artist_name = match.group('artist').strip()
-                        else:
-                            # If 'by' is not present, assume only song name is given
-                            song_name = query.strip()
-                            artist_name = None
-                        # Call the updated get_song_information method
-                        song_info = self.get_song_information(song_name, artist_name)
-                        return song_info
-
-                    elif intent_name == 'trending_songs':
-                        # Handle trending songs request
-                        trending_songs, recent = self.get_trending_songs()
-                        if isinstance(trending_songs, str):
-                            # If an error message is returned
-                            return trending_songs
-                        if recent:
-                            response = "Here are the current trending songs:\n"
-                        else:
-                            response = "No recent songs found in the database. Here are the most popular songs of all time:\n"
-                        for song in trending_songs:
-                            response += f"- \"{song['name']}\" by {song['artists']} (Popularity: {song['popularity']})\n"
-                        return response
-
-                    elif intent_name == 'artist_information':
-                        # Handle artist information
-                        artist_name = user_input_lower.replace(phrase, '').strip()
-                        # Clean the artist name
-                        artist_name = re.sub(r'[^\w\s]', '', artist_name)
-                        artist_info = self.get_artist_stats(artist_name)
-                        response = self.format_artist_info(artist_info, artist_name)
-                        return response
-
-                    elif intent_name == 'recommend_songs':
-                        # Start collecting preferences
-                        self.preferences = {}
-                        self.state = 'collecting_preferences'
-                        self.preference_params = ['valence', 'acousticness', 'danceability', 'energy', 'tempo']
-                        self.preference_index = 0
-                        # Get the explanation for the first parameter
-                        first_param = self.preference_params[0]
-                        param_explanation = self.get_parameter_explanation(first_param)
-                        if first_param == 'tempo':
-                            return (
-                                "Sure! Let's find songs based on your preferences.\n"
-                                f"{param_explanation}\nWhat **{first_param}** value do you prefer? (Enter a number, e.g., 60-180 BPM)"
-                            )
-                        else:
-                            return (
-                                "Sure! Let's find songs based on your preferences.\n"
-                                f"{param_explanation}\nWhat **{first_param}** value do you prefer? (Enter a number between 0 and 1)"
-                            )
-                    # Add more intent handling here as needed
+        intent_name, phrase = self.match_intent(user_input_lower)
+
+        if intent_name == 'song_information':
+            # Extract the song name and artist name
+            # Remove the phrase from the input
+            query = user_input_lower.replace(phrase, '').strip()
+            # Use regular expression to extract song and artist names
+            match = SONG_BY_ARTIST_PATTERN.match(query)
+            if match:
+                song_name = match.group('song').strip()
+                artist_name = match.group('artist').strip()
+            else:
+                # If 'by' is not present, assume only song name is given
+                song_name = query.strip()
+                artist_name = None
+            # Call the updated get_song_information method
+            song_info = self.get_song_information(song_name, artist_name)
+            return song_info
+
+        elif intent_name == 'trending_songs':
+            # Handle trending songs request
+            trending_songs, recent = self.get_trending_songs()
+            if isinstance(trending_songs, str):
+                # If an error message is returned
+                return trending_songs
+            if recent:
+                response = "Here are the current trending songs:\n"
+            else:
+                response = "No recent songs found in the database. Here are the most popular songs of all time:\n"
+            response += "".join(
+                f"- \"{song['name']}\" by {song['artists']} (Popularity: {song['popularity']})\n"
+                for song in trending_songs
+            )
+            return response
+
+        elif intent_name == 'artist_information':
+            # Handle artist information
+            artist_name = user_input_lower.replace(phrase, '').strip()
+            # Clean the artist name
+            artist_name = NON_WORD_SPACE_PATTERN.sub('', artist_name)
+            artist_info = self.get_artist_stats(artist_name)
+            response = self.format_artist_info(artist_info, artist_name)
+            return response
+
+        elif intent_name == 'recommend_songs':
+            # Start collecting preferences
+            self.preferences = {}
+            self.state = 'collecting_preferences'
+            self.preference_params = ['valence', 'acousticness', 'danceability', 'energy', 'tempo']
+            self.preference_index = 0
+            # Get the explanation for the first parameter
+            first_param = self.preference_params[0]
+            param_explanation = self.get_parameter_explanation(first_param)
+            if first_param == 'tempo':
+                return (
+                    "Sure! Let's find songs based on your preferences.\n"
+                    f"{param_explanation}\nWhat **{first_param}** value do you prefer? (Enter a number, e.g., 60-180 BPM)"
+                )
+            else:
+                return (
+                    "Sure! Let's find songs based on your preferences.\n"
+                    f"{param_explanation}\nWhat **{first_param}** value do you prefer? (Enter a number between 0 and 1)"
+                )
+        # Add more intent handling here as needed
 
         # Check if we're collecting preferences
         if self.state == 'collecting_preferences':
             return self.collect_preferences(user_input)
 
         # Fallback response using the responses dictionary
-        matched_intent, score, _ = process.extractOne(
-            user_input, responses.keys(), scorer=fuzz.token_set_ratio
-        )
-        if score >= 70:
-            return responses[matched_intent]
+        if user_input_lower in responses:
+            return responses[user_input_lower]
+        if fallback_scores is not None:
+            index = int(np.argmax(fallback_scores))
+            if fallback_scores[index] >= 70:
+                return responses[self._responses_keys[index]]
+        else:
+            match = process.extractOne(
+                default_process(user_input), self._responses_preproc,
+                scorer=fuzz.token_set_ratio, processor=None, score_cutoff=70
+            )
+            if match is not None:
+                _, _, index = match
+                return responses[self._responses_keys[index]]
 
         return "I'm not sure what you're asking. Could you rephrase your question?"
 
+    def get_responses(self, batch: list, user_id: str = None) -> list:
+        """
+        Processes several user inputs in order and returns their responses.
+
+        The fuzzy fallback scores for the whole batch are computed up front with a
+        single rapidfuzz cdist call; messages are still handled one after another
+        since preference collection depends on the previous message.
+
+        Parameters:
+            batch (list of str): User inputs.
+            user_id (str, optional): Identifier of the user sending the inputs.
+
+        Returns:
+            list of str: One response per input.
+        """
+        if not batch:
+            return []
+        scores = process.cdist(
+            [default_process(user_input) for user_input in batch], self._responses_preproc,
+            scorer=fuzz.token_set_ratio, processor=None, score_cutoff=70, workers=-1
+        )
+        return [
+            self.get_response(user_input, user_id=user_id, fallback_scores=row)
+            for user_input, row in zip(batch, scores)
+        ]
+
+    def read_stdin_batches(self):
+        """
+        Yields lists of lines from a piped stdin as soon as they can be read.
+
+        Each read returns whatever is already available on the file descriptor, so a
+        client sending one line at a time gets an answer per line, while piped files
+        are answered in batches of up to STDIN_BATCH_SIZE lines.
+
+        Yields:
+            list of str: Input lines without their line endings.
+        """
+        try:
+            fd = sys.stdin.fileno()
+        except (AttributeError, OSError):
+            # Streams without a file descriptor are read line by line
+            for line in iter(sys.stdin.readline, ''):
+                yield [line.rstrip('\r\n')]
+            return
+
+        encoding = sys.stdin.encoding or 'utf-8'
+        pending = b''
+        while True:
+            data = os.read(fd, 1 << 16)
+            if not data:
+                break
+            *complete, pending = (pending + data).split(b'\n')
+            lines = [line.decode(encoding, errors='replace').rstrip('\r') for line in complete]
+            for start in range(0, len(lines), STDIN_BATCH_SIZE):
+                yield lines[start:start + STDIN_BATCH_SIZE]
+        if pending:
+            yield [pending.decode(encoding, errors='replace').rstrip('\r')]
+
     def run(self):
         """
         Starts the chatbot interaction loop.
@@ -487,8 +932,25 @@ class NagmaChatbot:
         print("- Release date information")
         print("And more! Type 'exit' to end the chat.")
 
+        if not sys.stdin.isatty():
+            # Piped input: answer lines as they arrive, batching only those already readable
+            for chunk in self.read_stdin_batches():
+                exit_at = next((i for i, line in enumerate(chunk) if line.lower() == 'exit'), None)
+                if exit_at is not None:
+                    chunk = chunk[:exit_at]
+                for response in self.get_responses(chunk):
+                    print("Chatbot:", response)
+                sys.stdout.flush()
+                if exit_at is not None:
+                    break
+            print("Chatbot: Goodbye!")
+            return
+
         while True:
-            user_input = input("You: ")
+            try:
+                user_input = input("You: ")
+            except EOFError:
+                user_input = 'exit'
             if user_input.lower() == 'exit':
                 print("Chatbot: Goodbye!")
                 break
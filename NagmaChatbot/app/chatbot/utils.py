@@ -1,6 +1,13 @@
 import pandas as pd
 import re
 
+NUMERIC_RANGE_PATTERNS = [
+    re.compile(r'(\d+\.?\d*)\s*-\s*(\d+\.?\d*)'),
+    re.compile(r'between\s+(\d+\.?\d*)\s+and\s+(\d+\.?\d*)'),
+]
+ARTIST_LIST_PATTERN = re.compile(r"'([^']*)'|\"([^\"]*)\"")
+ARTIST_SEPARATOR_PATTERN = re.compile(r'[;,]')
+
 def parse_release_date(date_str):
     """
     Parses a date string into a pandas Timestamp object.
@@ -43,13 +50,29 @@ def extract_numeric_range(text):
     Returns:
         list: A list containing the lower and upper bounds of the range.
     """
-    patterns = [
-        r'(\d+\.?\d*)\s*-\s*(\d+\.?\d*)',
-        r'between\s+(\d+\.?\d*)\s+and\s+(\d+\.?\d*)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in NUMERIC_RANGE_PATTERNS:
+        match = pattern.search(text)
         if match:
             return sorted([float(match.group(1)), float(match.group(2))])
-    return None
\ No newline at end of file
+    return None
+
+def split_artists(artists):
+    """
+    Splits an artists field into individual, lowercased artist names.
+
+    Handles list-style strings such as "['Artist A', 'Artist B']" as well as
+    plain strings separated by commas or semicolons.
+
+    Parameters:
+        artists (str): The artists field from the dataset.
+
+    Returns:
+        list: Lowercased artist names.
+    """
+    if not isinstance(artists, str):
+        return []
+    if artists.startswith('['):
+        names = [single or double for single, double in ARTIST_LIST_PATTERN.findall(artists)]
+    else:
+        names = ARTIST_SEPARATOR_PATTERN.split(artists)
+    return [name.strip().lower() for name in names if name.strip()]
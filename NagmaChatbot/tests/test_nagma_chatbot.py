@@ -0,0 +1,269 @@
+# tests/test_nagma_chatbot.py
+
+import selectors
+import shutil
+import subprocess
+import sys
+from itertools import permutations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.chatbot import nagma_chatbot
+from app.chatbot.nagma_chatbot import NagmaChatbot, PREFERENCE_FEATURES, _filter_topk
+from app.chatbot.responses import intents
+from app.chatbot.utils import split_artists
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "app" / "chatbot" / "data.csv"
+
+@pytest.fixture(scope="module")
+def data_path(tmp_path_factory):
+    # Work on a copy so the dataset cache is not written next to the real CSV
+    path = tmp_path_factory.mktemp("data") / "data.csv"
+    shutil.copy(DATA_PATH, path)
+    return str(path)
+
+@pytest.fixture(scope="module")
+def chatbot(data_path):
+    return NagmaChatbot(data_path)
+
+def expected_recommendations(chatbot, preferences):
+    """Plain pandas filter plus stable popularity sort, formatted like the chatbot."""
+    df = chatbot.df
+    mask = np.ones(len(df), dtype=bool)
+    for param, value in preferences.items():
+        if value is None:
+            continue
+        tolerance = 10 if param == 'tempo' else 0.1
+        min_value = max(0, value - tolerance)
+        max_value = value + tolerance if param == 'tempo' else min(1, value + tolerance)
+        mask &= ((df[param] >= np.float32(min_value)) & (df[param] <= np.float32(max_value))).to_numpy()
+    top_songs = df[mask].sort_values(by='popularity', ascending=False, kind='stable').head(5)
+    if top_songs.empty:
+        return "Sorry, I couldn't find any songs matching your preferences."
+    response = "Here are some songs that match your preferences:\n"
+    for _, song in top_songs.iterrows():
+        response += f"- \"{song['name']}\" by {song['artists']}\n"
+    return response
+
+def test_preference_recommendations_match_pandas(chatbot):
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        # Start from an existing song so most preference sets have matches
+        song = chatbot.df.iloc[rng.integers(len(chatbot.df))]
+        preferences = {param: round(float(song[param]), 2) for param in PREFERENCE_FEATURES}
+        # Leave some preferences unset
+        for param in PREFERENCE_FEATURES:
+            if rng.random() < 0.3:
+                preferences[param] = None
+        chatbot.preferences = preferences
+        assert chatbot.recommend_songs_based_on_preferences() == expected_recommendations(chatbot, preferences)
+
+def test_preference_recommendations_without_preferences(chatbot):
+    chatbot.preferences = {param: None for param in PREFERENCE_FEATURES}
+    assert chatbot.recommend_songs_based_on_preferences() == expected_recommendations(chatbot, chatbot.preferences)
+
+def test_preference_recommendations_no_matches(chatbot):
+    chatbot.preferences = {'valence': 0.95, 'acousticness': 0.95, 'danceability': 0.05, 'energy': 0.05, 'tempo': 250.0}
+    assert chatbot.recommend_songs_based_on_preferences() == "Sorry, I couldn't find any songs matching your preferences."
+
+def test_filter_topk_fewer_rows_than_chunks():
+    feat = np.array([[0.5, 0.5], [0.1, 0.9], [0.6, 0.4]], dtype=np.float32)
+    pop = np.array([10, 50, 10], dtype=np.uint8)
+    lo = np.array([0.4, -np.inf], dtype=np.float32)
+    hi = np.array([np.inf, np.inf], dtype=np.float32)
+    best_pop, best_row = _filter_topk(feat, pop, lo, hi, 5, 8)
+    assert best_pop.shape == (8, 5)
+    found = best_row >= 0
+    rows = best_row[found][np.lexsort((best_row[found], -best_pop[found]))]
+    assert rows.tolist() == [0, 2]
+
+def test_filter_topk_matches_sort_across_chunk_counts():
+    rng = np.random.default_rng(1)
+    feat = rng.random((1000, 5), dtype=np.float32)
+    pop = rng.integers(0, 5, 1000).astype(np.uint8)  # many ties
+    lo = np.full(5, 0.2, dtype=np.float32)
+    hi = np.full(5, 0.9, dtype=np.float32)
+    matches = np.flatnonzero(((feat >= lo) & (feat <= hi)).all(axis=1))
+    expected = matches[np.argsort(-pop[matches].astype(np.int16), kind='stable')][:5]
+    for n_chunks in (1, 3, 7, 2000):
+        best_pop, best_row = _filter_topk(feat, pop, lo, hi, 5, n_chunks)
+        found = best_row >= 0
+        rows = best_row[found][np.lexsort((best_row[found], -best_pop[found]))][:5]
+        assert rows.tolist() == expected.tolist()
+
+def expected_intent(user_input_lower):
+    """The original sequential scan over intents and their phrases."""
+    for intent_name, phrases in intents.items():
+        for phrase in phrases:
+            if phrase in user_input_lower:
+                return intent_name, phrase
+    return None, None
+
+def test_match_intent_regex_fallback_matches_loop(data_path, monkeypatch):
+    monkeypatch.setattr(nagma_chatbot, "ahocorasick", None)
+    bot = NagmaChatbot(data_path)
+    assert bot._intent_ac is None
+    phrases = [phrase for phrases in intents.values() for phrase in phrases]
+    inputs = ["information about i want song recommendations", "asdfgh", ""]
+    for a, b in permutations(phrases, 2):
+        inputs += [f"{a} {b}", f"x {b} y {a}", f"{a}{b}"]
+    for user_input_lower in inputs:
+        assert bot.match_intent(user_input_lower) == expected_intent(user_input_lower)
+    assert bot.match_intent("information about i want song recommendations") == ('recommend_songs', 'song recommendations')
+
+def test_match_intent_automaton_matches_loop(chatbot):
+    if chatbot._intent_ac is None:
+        pytest.skip("pyahocorasick is not installed")
+    phrases = [phrase for phrases in intents.values() for phrase in phrases]
+    for a, b in permutations(phrases, 2):
+        for user_input_lower in (f"{a} {b}", f"x {b} y {a}"):
+            assert chatbot.match_intent(user_input_lower) == expected_intent(user_input_lower)
+
+def test_get_responses_matches_get_response(data_path):
+    batch = [
+        "hello",
+        "what is valence",
+        "recommend songs",
+        "0.5", "0.1", "0.7", "0.6", "120",
+        "ENERGY please",
+        "who is Coldplay",
+        "tell me about the song Yellow",
+        "latest trending songs",
+        "asdfgh",
+        "",
+    ]
+    expected = NagmaChatbot(data_path)
+    batched = NagmaChatbot(data_path)
+    assert batched.get_responses(batch) == [expected.get_response(user_input) for user_input in batch]
+    assert batched.get_responses([]) == []
+
+def test_dataset_cache_discarded_on_version_mismatch(chatbot, data_path, monkeypatch):
+    cache_path = f"{data_path}.clean.feather"
+    cached = chatbot.load_cached_dataset(data_path, cache_path)
+    assert cached is not None
+    pd.testing.assert_frame_equal(cached, chatbot.df)
+    monkeypatch.setattr(nagma_chatbot, "DATASET_CACHE_VERSION", b"0")
+    assert chatbot.load_cached_dataset(data_path, cache_path) is None
+
+def test_save_cached_dataset_replaces_cache_atomically(chatbot, tmp_path, monkeypatch):
+    cache_path = tmp_path / "data.csv.clean.feather"
+    cache_path.write_bytes(b"old cache")
+    chatbot.save_cached_dataset(str(cache_path))
+    assert cache_path.read_bytes() != b"old cache"
+    assert [p.name for p in tmp_path.iterdir()] == [cache_path.name]
+
+    # A failed write leaves the previous cache in place and no temporary file behind
+    previous = cache_path.read_bytes()
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(nagma_chatbot.feather, "write_feather", fail)
+    chatbot.save_cached_dataset(str(cache_path))
+    assert cache_path.read_bytes() == previous
+    assert [p.name for p in tmp_path.iterdir()] == [cache_path.name]
+
+def test_run_answers_piped_lines_as_they_arrive(data_path):
+    script = f"from app.chatbot.nagma_chatbot import NagmaChatbot; NagmaChatbot({data_path!r}).run()"
+    proc = subprocess.Popen(
+        [sys.executable, "-c", script], cwd=Path(__file__).resolve().parent.parent,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        proc.stdin.write("what is valence\n")
+        proc.stdin.flush()
+        # The answer must arrive while stdin is still open
+        selector = selectors.DefaultSelector()
+        selector.register(proc.stdout, selectors.EVENT_READ)
+        answer = None
+        while answer is None:
+            assert selector.select(timeout=60), "no answer while stdin was open"
+            line = proc.stdout.readline()
+            assert line, "chatbot exited early"
+            if line.startswith("Chatbot:"):
+                answer = line
+        assert "Valence" in answer
+        proc.stdin.write("exit\n")
+        proc.stdin.flush()
+        assert proc.stdout.read().strip() == "Chatbot: Goodbye!"
+        assert proc.wait(timeout=60) == 0
+    finally:
+        proc.kill()
+
+def test_top_k_by_popularity_matches_stable_argsort(chatbot):
+    rng = np.random.default_rng(2)
+    pop = chatbot._pop.astype(np.int16)
+    for density in (0.0, 0.001, 0.01, 0.5, 1.0):
+        mask = rng.random(len(pop)) < density
+        rows = np.flatnonzero(mask)
+        expected = rows[np.argsort(-pop[rows], kind='stable')]
+        for k in (0, 1, 5, 20, len(rows) + 1):
+            assert chatbot.top_k_by_popularity(mask, k).tolist() == expected[:k].tolist()
+    assert chatbot.top_k_by_popularity(None, 0).tolist() == []
+    assert chatbot.top_k_by_popularity(None, 5).tolist() == np.argsort(-pop, kind='stable')[:5].tolist()
+
+def test_get_trending_songs_zero(chatbot):
+    song_list, _ = chatbot.get_trending_songs(num_songs=0)
+    assert song_list == []
+
+def test_cold_and_cached_loads_match(tmp_path):
+    data_path = tmp_path / "data.csv"
+    shutil.copy(DATA_PATH, data_path)
+    cold = NagmaChatbot(str(data_path))
+    assert (tmp_path / "data.csv.clean.feather").exists()
+    warm = NagmaChatbot(str(data_path))
+    pd.testing.assert_frame_equal(cold.df, warm.df)
+    assert cold.df['artists'].cat.categories.dtype == warm.df['artists'].cat.categories.dtype
+
+def test_artist_aggregates_match_direct_reductions(chatbot):
+    df = chatbot.df
+    features = [feature for feature in nagma_chatbot.ARTIST_STAT_FEATURES if feature in df.columns]
+    rng = np.random.default_rng(3)
+    tokens = list(chatbot._artist_index)
+    for token in rng.choice(tokens, size=min(300, len(tokens)), replace=False):
+        songs = df.iloc[chatbot._artist_index[token]]
+        agg = chatbot._artist_agg[token]
+        for feature in features:
+            assert agg[(feature, 'mean')] == pytest.approx(songs[feature].mean(), rel=1e-6)
+            assert agg[(feature, 'min')] == songs[feature].min()
+            assert agg[(feature, 'max')] == songs[feature].max()
+        assert chatbot._artist_counts[token] == len(songs)
+        assert chatbot._artist_avg_popularity[token] == pytest.approx(songs['popularity'].mean())
+        assert chatbot._artist_most_recent[token] == songs['release_date'].max()
+
+def test_name_and_artist_indexes_match_dataset(chatbot):
+    df = chatbot.df
+    names = df['name'].str.lower().to_numpy()
+    artists = [split_artists(value) for value in df['artists'].to_numpy()]
+    rng = np.random.default_rng(4)
+    for row in rng.integers(len(df), size=200):
+        name = names[row]
+        assert chatbot._name_index[name].tolist() == np.flatnonzero(names == name).tolist()
+        for token in artists[row]:
+            expected = [i for i, row_artists in enumerate(artists) if token in row_artists]
+            assert chatbot._artist_index[token].tolist() == expected
+
+def test_song_information_by_artist_matches_dataset(chatbot):
+    df = chatbot.df
+    names = df['name'].str.lower().to_numpy()
+    artists_lower = df['artists'].astype(str).str.lower().to_numpy()
+    pop = df['popularity'].to_numpy()
+    rng = np.random.default_rng(5)
+    for row in rng.integers(len(df), size=100):
+        name = names[row]
+        token = split_artists(df['artists'].iat[row])[0]
+        # Exact artist tokens use the index intersection, partial names the substring scan
+        for artist_name in (token, token[:max(3, len(token) // 2)].strip()):
+            if artist_name in chatbot._artist_index:
+                matches = [i for i in np.flatnonzero(names == name) if artist_name in split_artists(df['artists'].iat[i])]
+            else:
+                matches = [i for i in np.flatnonzero(names == name) if artist_name in artists_lower[i]]
+            response = chatbot.get_song_information(name, artist_name)
+            if not matches:
+                assert response == f"Sorry, I couldn't find the song '{name.strip()}' by '{artist_name}'."
+                continue
+            best = matches[int(np.argmax(pop[matches]))]
+            assert response.startswith(f"Here's some information about '{df['name'].iat[best]}' by {df['artists'].iat[best]}:\n")
+            assert f"- Popularity: {pop[best]}/100\n" in response
+    assert chatbot.get_song_information(names[0], "zzzqqq").startswith("Sorry, I couldn't find the song")
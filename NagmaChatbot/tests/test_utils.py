@@ -0,0 +1,27 @@
+# tests/test_utils.py
+
+import math
+
+from app.chatbot.utils import split_artists
+
+def test_split_artists_single_quoted_list():
+    assert split_artists("['Wiz Khalifa', 'Charlie Puth']") == ['wiz khalifa', 'charlie puth']
+
+def test_split_artists_double_quoted_list():
+    assert split_artists('["Guns N\' Roses"]') == ["guns n' roses"]
+
+def test_split_artists_mixed_quotes():
+    assert split_artists("[\"Destiny's Child\", 'Beyoncé']") == ["destiny's child", 'beyoncé']
+
+def test_split_artists_comma_inside_quotes():
+    assert split_artists("['Tyler, The Creator', 'Frank Ocean']") == ['tyler, the creator', 'frank ocean']
+
+def test_split_artists_plain_separators():
+    assert split_artists("Queen, David Bowie") == ['queen', 'david bowie']
+    assert split_artists("Queen; David Bowie ;") == ['queen', 'david bowie']
+    assert split_artists("Adele") == ['adele']
+
+def test_split_artists_non_string():
+    assert split_artists(None) == []
+    assert split_artists(math.nan) == []
+    assert split_artists(42) == []